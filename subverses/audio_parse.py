@@ -1,5 +1,11 @@
+import os
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
@@ -7,11 +13,35 @@ import typer
 
 from subverses.config import Context
 
+try:  # optional, Linux only: batch stat() submissions through io_uring
+    import liburing
+except ImportError:
+    liburing = None
+
+try:  # optional: vectorized conversion of silencedetect matches
+    import numpy
+except ImportError:
+    numpy = None
+
 # As per https://platform.openai.com/docs/guides/speech-to-text
 # "File uploads are currently limited to 25 MB and the following input
 # file types are supported: mp3, mp4, mpeg, mpga, m4a, wav, and webm."
 max_clip_size = 24.5 * 1024**2  # 25 MB
 
+# silencedetect reports on stderr; matched against raw bytes in a single pass
+_SILENCE_RE = re.compile(rb"silence_start:\s*([-\d.]+)")
+
+# how many trailing log lines to keep around for error reporting
+_ERROR_TAIL_LINES = 50
+
+# the segment muxer announces each output file at info level; seeing the
+# next announcement means the previous file is finalized
+_SEGMENT_OPEN_RE = re.compile(r"Opening '(.+)' for writing")
+
+# formats whose stream-copied packets can be concatenated byte-for-byte,
+# with no container remuxing needed
+_RAW_CONCAT_SUFFIXES = {".mp3", ".aac", ".ts"}
+
 
 class AudioParseError(Exception):
     """Audio parse error."""
@@ -29,16 +59,50 @@ class SegmentTooLongError(AudioParseError):
     """Segment too long error."""
 
 
+def _splits_from_matches(matches: List[bytes], half_silence_len: float) -> List[float]:
+    """Convert collected silence_start matches to shifted split midpoints.
+
+    With numpy available the float conversion and the offset addition are
+    vectorized in one go; the return type stays a plain list either way.
+    """
+    if numpy is not None:
+        return (numpy.asarray(matches, dtype=numpy.float64) + half_silence_len).tolist()
+    return [float(match) + half_silence_len for match in matches]
+
+
+def _split_base(audio_file_path: Path, split_prefix=".splits_") -> str:
+    """Return the prefixed stem shared by all split file names."""
+    suffix = audio_file_path.suffix
+    name = audio_file_path.name
+    return split_prefix + (name[: -len(suffix)] if suffix else name)
+
+
 def split_file_format(audio_file_path: Path, split_prefix=".splits_"):
     """Return the path used to construct the split file name."""
     return audio_file_path.parent / (split_prefix + audio_file_path.name)
 
 
+def _split_pattern(audio_file_path: Path, split_prefix=".splits_") -> str:
+    """Return the printf-style %03d output pattern for ffmpeg's segment muxer."""
+    base = _split_base(audio_file_path, split_prefix)
+    return str(audio_file_path.parent / f"{base}.%03d{audio_file_path.suffix}")
+
+
+def _split_name_template(audio_file_path: Path, split_prefix=".splits_"):
+    """Return a callable mapping a split number to its file Path.
+
+    The directory and name parts are computed once, so hot loops do not
+    rebuild the same Path pieces for every index.
+    """
+    parent = audio_file_path.parent
+    suffix = audio_file_path.suffix
+    base = _split_base(audio_file_path, split_prefix)
+    return lambda split_no: parent / f"{base}.{split_no:03d}{suffix}"
+
+
 def n_split_file(audio_file_path: Path, split_no: int, split_prefix=".splits_") -> Path:
     """Return the nth split file name."""
-    return split_file_format(audio_file_path, split_prefix=split_prefix).with_suffix(
-        f".{split_no:03d}" + audio_file_path.suffix
-    )
+    return _split_name_template(audio_file_path, split_prefix=split_prefix)(split_no)
 
 
 def detect_silence_splits_with_ffmpeg(context: Context) -> List[float]:
@@ -48,8 +112,23 @@ def detect_silence_splits_with_ffmpeg(context: Context) -> List[float]:
     """
     command = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        # silencedetect reports at info level; progress spam is already
+        # disabled by -nostats
+        "-loglevel",
+        "info",
         "-i",
         context.audio_filepath,
+        # decode only the first audio stream; video/subtitle/data streams
+        # would otherwise be decoded just to be thrown away
+        "-vn",
+        "-sn",
+        "-dn",
+        "-map",
+        "0:a:0",
+        "-threads",
+        "0",
         "-af",
         f"silencedetect=noise={context.silence_threshold}dB:duration={context.min_silence_len_sec}",
         "-f",
@@ -59,35 +138,233 @@ def detect_silence_splits_with_ffmpeg(context: Context) -> List[float]:
     typer.echo(" ".join(command))
     process = subprocess.Popen(
         command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
     )
-    # Use communicate() to capture output
-    stdout_output, stderr_output = process.communicate()
+    # Scan stderr incrementally so parsing overlaps ffmpeg's decoding and the
+    # log never has to be buffered whole (a full pipe buffer would also stall
+    # ffmpeg).
+    matches = []
+    log_tail = deque(maxlen=_ERROR_TAIL_LINES)
+    for line in process.stderr:
+        log_tail.append(line)
+        match = _SILENCE_RE.search(line)
+        if match is not None:
+            matches.append(match.group(1))
+    process.wait()
 
-    # Check for errors
-    if stderr_output:
-        raise SilenceDetectionError(stderr_output)
+    # silencedetect itself reports via stderr, so only the exit code signals
+    # failure
     if process.returncode != 0:
-        raise AudioParseError(stdout_output)
+        raise SilenceDetectionError(b"".join(log_tail).decode(errors="replace"))
 
-    return [
-        float(line.split("silence_start: ")[1]) + context.min_silence_len_sec / 2
-        for line in stdout_output.split("\n")
-        if "silence_start" in line
+    return _splits_from_matches(matches, context.min_silence_len_sec / 2)
+
+
+def audio_duration_seconds(audio_file_path: Path) -> float:
+    """Return the duration of an audio file in seconds using ffprobe."""
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(audio_file_path),
     ]
+    result = subprocess.run(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    if result.returncode != 0:
+        raise AudioParseError(result.stderr)
+    return float(result.stdout.strip())
+
+
+def audio_bit_rate(audio_file_path: Path) -> float:
+    """Return the bit rate of an audio file in bits per second using ffprobe."""
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=bit_rate",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(audio_file_path),
+    ]
+    result = subprocess.run(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    if result.returncode != 0:
+        raise AudioParseError(result.stderr)
+    return float(result.stdout.strip())
+
+
+def split_audio_by_size(context: Context) -> List[tuple[Path, float]]:
+    """Split the audio into fixed-duration chunks under max_clip_size.
+
+    Skips silence detection entirely: the chunk duration is derived from the
+    bit rate reported by ffprobe, so the whole split costs one stream-copy
+    pass. Chunk boundaries land wherever the time grid falls, which is fine
+    when subtitle-accurate boundaries are not required.
+
+    :return: A list of tuples, each containing the path to a chunk and the
+        start time of the chunk.
+    """
+    segment_time = max_clip_size * 8 / audio_bit_rate(context.audio_path) * 0.98
+    # stale split files from an earlier run (possibly cut at different
+    # boundaries) would inflate the chunk count below and pair old files
+    # with wrong offsets
+    for stale in context.audio_path.parent.glob(
+        _split_base(context.audio_path) + ".*" + context.audio_path.suffix
+    ):
+        stale.unlink()
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        context.audio_filepath,
+        "-f",
+        "segment",
+        "-segment_time",
+        str(segment_time),
+        "-c",
+        "copy",
+        _split_pattern(context.audio_path),
+    ]
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    log_tail = deque(process.stderr, maxlen=_ERROR_TAIL_LINES)
+    process.wait()
+    if process.returncode != 0:
+        raise AudioSplitError("".join(log_tail))
+
+    prefix = _split_base(context.audio_path) + "."
+    suffix = context.audio_path.suffix
+    with os.scandir(context.audio_path.parent) as entries:
+        chunks = sum(
+            1
+            for entry in entries
+            if entry.name.startswith(prefix) and entry.name.endswith(suffix)
+        )
+
+    split_name = _split_name_template(context.audio_path)
+    return [(split_name(i), i * segment_time) for i in range(chunks)]
+
+
+def split_audio_by_size_direct(
+    context: Context, silence_splits: List[float], on_segment=None
+) -> List[tuple[Path, float]]:
+    """Produce the final upload-sized chunks with a single ffmpeg pass.
+
+    Coalesces the silence midpoints under the byte budget and lets the
+    segment muxer cut at exactly those times, so the split files *are* the
+    recombined chunks — no per-group concat pass and no second write of the
+    audio data.
+
+    :param context: The context.
+    :param silence_splits: Silence midpoints, in seconds, ascending.
+    :return: A list of tuples, each containing the path to a chunk and the
+        start time of the chunk.
+    :raises SegmentTooLongError: if the byte-rate estimate overshot and a
+        produced chunk exceeds max_clip_size.
+    """
+    coalesced_splits = coalesce_silence_splits(context, silence_splits)
+    typer.echo(f"Splitting audio file into {len(coalesced_splits) + 1} chunks...")
+    start_times = [0.0] + coalesced_splits
+    split_name = _split_name_template(context.audio_path)
+
+    stream_segment = None
+    if on_segment is not None:
+
+        def stream_segment(split_no):
+            # verify each chunk the moment it is final, so an overshoot
+            # aborts the split instead of surfacing after the whole pass
+            if split_name(split_no).stat().st_size > max_clip_size:
+                raise SegmentTooLongError(f"Segment {split_no} is too large.")
+            on_segment((split_name(split_no), start_times[split_no]))
+
+    split_audio_with_ffmpeg(context, coalesced_splits, on_segment=stream_segment)
+
+    segment_sizes = get_segment_sizes(context, len(coalesced_splits) + 1)
+    for i, size in enumerate(segment_sizes):
+        if size > max_clip_size:
+            raise SegmentTooLongError(f"Segment {i} is too large.")
+
+    return [(split_name(i), start_times[i]) for i in range(len(coalesced_splits) + 1)]
+
+
+def coalesce_silence_splits(context: Context, splits: List[float]) -> List[float]:
+    """Coalesce silence midpoints so each predicted chunk stays under max_clip_size.
 
+    Estimates the byte rate from the source file size and duration, then
+    greedily keeps only the split points needed to stay within the byte
+    budget. Splitting on the coalesced list directly produces upload-sized
+    chunks, so no recombine pass is needed.
 
-def split_audio_with_ffmpeg(context: Context, segments: List[float]):
+    :param context: The context.
+    :param splits: Silence midpoints, in seconds, ascending.
+    :return: The coalesced subset of split points.
+    """
+    duration = audio_duration_seconds(context.audio_path)
+    byte_rate = context.audio_path.stat().st_size / duration
+    # safety margin: stream-copy segments do not cut exactly at the
+    # requested times
+    budget_sec = max_clip_size / byte_rate * 0.95
+
+    coalesced = []
+    chunk_start = 0.0
+    candidate = None
+    for split in splits:
+        if candidate is None and split - chunk_start > budget_sec:
+            # no silence available inside the budget; cut here and accept an
+            # oversized chunk (the caller verifies the real sizes afterwards)
+            coalesced.append(split)
+            chunk_start = split
+            continue
+        if candidate is not None and split - chunk_start > budget_sec:
+            coalesced.append(candidate)
+            chunk_start = candidate
+            candidate = None
+        if split - chunk_start <= budget_sec:
+            candidate = split
+
+    # the tail chunk may still exceed the budget without a final cut
+    if candidate is not None and duration - chunk_start > budget_sec:
+        coalesced.append(candidate)
+
+    return coalesced
+
+
+def split_audio_with_ffmpeg(context: Context, segments: List[float], on_segment=None):
     """Split an audio file using ffmpeg.
 
     :param context: The context.
     :param segments: A list of floats, each containing the split points.
+    :param on_segment: Optional callable invoked with each split number as
+        soon as that split file is finalized on disk, while ffmpeg is still
+        cutting the rest. Lets callers start consuming early splits instead
+        of waiting for the whole pass.
     :return: A list of paths to the split audio files.
     """
     command = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        # the per-file "Opening ..." announcements needed for on_segment are
+        # logged at info level
+        "-loglevel",
+        "info" if on_segment is not None else "error",
         "-i",
         context.audio_path,
         "-f",
@@ -96,40 +373,94 @@ def split_audio_with_ffmpeg(context: Context, segments: List[float]):
         ",".join(str(s) for s in segments),
         "-c",
         "copy",
-        split_file_format(context.audio_path).with_suffix(".%03d" + context.audio_path.suffix),
+        _split_pattern(context.audio_path),
     ]
 
     process = subprocess.Popen(
-        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
     )
 
-    # Use communicate() to capture output
-    stdout_output, stderr_output = process.communicate()
+    # Drain stderr incrementally, keeping only a tail for error reporting
+    log_tail = deque(maxlen=_ERROR_TAIL_LINES)
+    opened = 0
+    try:
+        for line in process.stderr:
+            log_tail.append(line)
+            if on_segment is not None and _SEGMENT_OPEN_RE.search(line):
+                if opened > 0:
+                    on_segment(opened - 1)
+                opened += 1
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.wait()
 
     # Check for errors
-    if stderr_output:
-        raise AudioSplitError(stderr_output)
     if process.returncode != 0:
-        raise AudioParseError(stdout_output)
+        raise AudioSplitError("".join(log_tail))
+    if on_segment is not None and opened > 0:
+        on_segment(opened - 1)
+
+
+def _concat_raw(input_files: List[Path], output_file: Path):
+    """Concatenate segment files byte-for-byte into the output file.
+
+    Uses sendfile(2) where available so the bytes move inside the kernel
+    page cache without crossing into user space; falls back to a buffered
+    user-space copy elsewhere.
+    """
+    with open(output_file, "wb") as output:
+        for file in input_files:
+            with open(file, "rb") as source:
+                if hasattr(os, "sendfile"):
+                    size = os.fstat(source.fileno()).st_size
+                    offset = 0
+                    while offset < size:
+                        offset += os.sendfile(
+                            output.fileno(), source.fileno(), offset, size - offset
+                        )
+                else:
+                    shutil.copyfileobj(source, output, length=8 * 1024**2)
 
 
 def concat_audio_segments(context: Context, input_files: List[Path], output_file: Path) -> Path:
     """Concat back audio segments into chunks of less than max_clip_size.
 
+    For raw-concatenable formats (mp3, adts-aac, mpeg-ts) the segments are
+    stitched directly in Python; other containers go through ffmpeg's
+    concat demuxer, which has to remux them.
+
     :param context: The context.
     :param output_file: The output file path object.
     :param input_files: A list of paths to the split audio files.
     :return: The path to the concatenated audio file.
     """
-    # Create the input string expected by ffmpeg for the concat demuxer
+    if output_file.suffix.lower() in _RAW_CONCAT_SUFFIXES:
+        _concat_raw(input_files, output_file)
+        # cleanup
+        for file in input_files:
+            file.unlink()
+        return output_file
+
+    # Write the concat demuxer's input list to a unique temporary file so
+    # concurrent concat calls cannot race on it
     input_string = "\n".join(f"file '{file.name}'" for file in input_files)
-    concat_filename = context.data_dir / "concat_files.txt"
-    # write the input string to a file
-    with open(concat_filename, "w") as f:
-        f.write(input_string)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=context.data_dir, prefix="concat_", suffix=".txt", delete=False
+    ) as concat_list:
+        concat_list.write(input_string)
+    concat_filename = Path(concat_list.name)
 
     command = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "error",
         "-y",
         "-safe",
         "0",
@@ -142,27 +473,23 @@ def concat_audio_segments(context: Context, input_files: List[Path], output_file
         output_file.name,
     ]
 
-    process = subprocess.Popen(
-        command,
-        cwd=context.data_dir,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True,
-    )
-    # Pass the input_string to ffmpeg via stdin and get the output
-    output, _ = process.communicate(input=input_string)
-
-    # Use communicate() to capture output
-    stdout_output, stderr_output = process.communicate()
-
-    concat_filename.unlink()
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=context.data_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        # Drain stderr incrementally, keeping only a tail for error reporting
+        log_tail = deque(process.stderr, maxlen=_ERROR_TAIL_LINES)
+        process.wait()
+    finally:
+        concat_filename.unlink()
 
     # Check for errors
-    if stderr_output:
-        raise AudioParseError(stderr_output)
     if process.returncode != 0:
-        raise AudioParseError(stdout_output)
+        raise AudioParseError("".join(log_tail))
 
     # cleanup
     for file in input_files:
@@ -171,9 +498,66 @@ def concat_audio_segments(context: Context, input_files: List[Path], output_file
     return output_file
 
 
+def _uring_stat_sizes(paths: List[Path]) -> List[int]:
+    """Return file sizes for all paths via a single io_uring submission.
+
+    All statx requests are queued into one submission, so the kernel round
+    trips once instead of once per file. Raises on any failed entry; callers
+    are expected to fall back to a conventional path.
+    """
+    ring = liburing.io_uring()
+    liburing.io_uring_queue_init(len(paths), ring, 0)
+    try:
+        statx_buffers = liburing.statx(len(paths))
+        # the bindings keep only a pointer into each path buffer, so the
+        # encoded names must outlive their queued SQEs — the same
+        # buffer-lifetime rule the io_uring download path applies to its
+        # write chunks
+        encoded_paths = [str(path).encode() for path in paths]
+        for i, encoded_path in enumerate(encoded_paths):
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_statx(
+                sqe,
+                liburing.AT_FDCWD,  # resolve relative paths like openat() would
+                encoded_path,
+                0,
+                liburing.STATX_SIZE,
+                statx_buffers[i],
+            )
+        liburing.io_uring_submit(ring)
+        cqe = liburing.io_uring_cqe()
+        for _ in paths:
+            liburing.io_uring_wait_cqe(ring, cqe)
+            liburing.trap_error(cqe.res)
+            liburing.io_uring_cqe_seen(ring, cqe)
+        return [statx_buffers[i].stx_size for i in range(len(paths))]
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+
 def get_segment_sizes(context: Context, segments: int):
-    """Return the size of each segment in seconds."""
-    return [n_split_file(context.audio_path, i).stat().st_size for i in range(segments)]
+    """Return the size of each segment in bytes.
+
+    With liburing available all sizes come from one io_uring submission;
+    otherwise one os.scandir pass over the data directory replaces a stat()
+    syscall per split file (DirEntry.stat() is served from the directory
+    read).
+    """
+    split_name = _split_name_template(context.audio_path)
+    if liburing is not None and sys.platform == "linux":
+        try:
+            return _uring_stat_sizes([split_name(i) for i in range(segments)])
+        except OSError:
+            pass
+
+    prefix = _split_base(context.audio_path) + "."
+    with os.scandir(context.audio_path.parent) as entries:
+        sizes = {
+            entry.name: entry.stat(follow_symlinks=False).st_size
+            for entry in entries
+            if entry.name.startswith(prefix)
+        }
+    return [sizes[split_name(i).name] for i in range(segments)]
 
 
 def get_sub_max_segments(context: Context, segments: int) -> List[List[int]]:
@@ -215,48 +599,118 @@ def recombine_segments(context: Context, segments: List[float]) -> List[tuple[Pa
     """
     segment_groups = get_sub_max_segments(context, len(segments) + 1)
     start_times = [0.0] + segments
+    split_name = _split_name_template(context.audio_path)
+    recombined_name = _split_name_template(context.audio_path, split_prefix=".recombined_")
 
-    return [
-        (
+    def concat_group(numbered_group):
+        i, segment_group = numbered_group
+        return (
             concat_audio_segments(
                 context,
-                [n_split_file(context.audio_path, segment) for segment in segment_group],
-                n_split_file(context.audio_path, i, split_prefix=".recombined_"),
+                [split_name(segment) for segment in segment_group],
+                recombined_name(i),
             ),
             start_times[segment_group[0]],
         )
-        for i, segment_group in enumerate(segment_groups)
-    ]
+
+    # Each concat is a stream-copy, i.e. I/O-bound, so the groups can be
+    # remuxed concurrently; executor.map preserves the group order.
+    with ThreadPoolExecutor(
+        max_workers=min(len(segment_groups), os.cpu_count() or 1)
+    ) as executor:
+        return list(executor.map(concat_group, enumerate(segment_groups)))
+
+
+def _tee_escape(path: str) -> str:
+    """Escape tee-muxer metacharacters in an output path.
+
+    In a tee spec ``|`` separates slave outputs and ``[``/``]`` delimit
+    per-slave options, so a legal filename containing them would silently
+    truncate the spec; a backslash makes ffmpeg take the next character
+    literally.
+    """
+    return re.sub(r"([\\|\[\]])", r"\\\1", path)
 
 
 def extract_audio(context):
-    """Extract audio from a video file"""
+    """Extract audio from a video file, detecting silence along the way.
+
+    The encoder output is tee'd into the audio file on disk and, at the same
+    time, piped into a second ffmpeg running silencedetect, so silence
+    detection finishes together with the extraction instead of re-reading
+    the finished file in a second pass. The detected midpoints are stored on
+    ``context.silence_splits``.
+    """
 
     if context.skip_existing and context.audio_path.exists():
         typer.echo(f"Skipping extraction of audio file: '{context.audio_filepath}'")
         return
 
-    command = [
+    extract_command = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
         "-i",
         context.video_filepath,
         "-vn",
+        "-sn",
+        "-dn",
+        "-map",
+        "0:a:0",
         "-c:a",
         "libmp3lame",
         "-b:a",
         "56k",
-        "-ac 1",
-        context.audio_filepath,
+        "-ac",
+        "1",
+        "-f",
+        "tee",
+        f"[f=mp3]{_tee_escape(context.audio_filepath)}|[f=mp3]pipe:1",
     ]
-    typer.echo(" ".join(command))
+    detect_command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-f",
+        "mp3",
+        "-i",
+        "pipe:0",
+        "-af",
+        f"silencedetect=noise={context.silence_threshold}dB:duration={context.min_silence_len_sec}",
+        "-f",
+        "null",
+        "-",
+    ]
+    typer.echo(" ".join(extract_command))
 
-    process = subprocess.Popen(
-        command, stdout=sys.stdout, stderr=sys.stderr, universal_newlines=True
+    extractor = subprocess.Popen(
+        extract_command, stdout=subprocess.PIPE, stderr=sys.stderr
     )
-    # Wait for the process to complete
-    process.wait()
+    detector = subprocess.Popen(
+        detect_command,
+        stdin=extractor.stdout,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    # let the detector own the read end so a detector exit unblocks ffmpeg
+    extractor.stdout.close()
+
+    matches = []
+    log_tail = deque(maxlen=_ERROR_TAIL_LINES)
+    for line in detector.stderr:
+        log_tail.append(line)
+        match = _SILENCE_RE.search(line)
+        if match is not None:
+            matches.append(match.group(1))
+    detector.wait()
+    extractor.wait()
 
     # Check for errors
-    if process.returncode != 0:
+    if extractor.returncode != 0:
         raise AudioParseError(
-            "FFmpeg process failed with exit code: {}".format(process.returncode))
+            "FFmpeg process failed with exit code: {}".format(extractor.returncode)
+        )
+    if detector.returncode != 0:
+        raise SilenceDetectionError(b"".join(log_tail).decode(errors="replace"))
+
+    context.silence_splits = _splits_from_matches(matches, context.min_silence_len_sec / 2)
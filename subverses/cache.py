@@ -0,0 +1,87 @@
+"""On-disk cache for fetched YouTube transcripts.
+
+A single SQLite database (WAL mode) holds every transcript keyed by
+(video_id, language), so batch runs over playlists do not accumulate
+thousands of small cache files each costing an open()+stat(). WAL also
+allows concurrent readers while one worker writes.
+"""
+
+import gzip
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+cache_dir = Path.home() / ".cache" / "subverses"
+
+# transcripts rarely change; keep them for a week
+transcript_ttl_sec = 7 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT,
+    lang TEXT,
+    transcript BLOB,
+    fetched_at INTEGER,
+    PRIMARY KEY (video_id, lang)
+)
+"""
+
+_connection: sqlite3.Connection | None = None
+
+
+def _connect() -> sqlite3.Connection:
+    """Return the cache database connection, creating it on first use."""
+    global _connection
+    if _connection is None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _connection = sqlite3.connect(
+            cache_dir / "subverses.db", isolation_level=None, check_same_thread=False
+        )
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.execute(_SCHEMA)
+    return _connection
+
+
+def get_transcript(vid_id: str, language: str):
+    """Return a cached transcript, or None on a miss or expired entry."""
+    try:
+        row = (
+            _connect()
+            .execute(
+                "SELECT transcript, fetched_at FROM transcripts"
+                " WHERE video_id = ? AND lang = ?",
+                (vid_id, language),
+            )
+            .fetchone()
+        )
+        if row is None or time.time() - row[1] > transcript_ttl_sec:
+            return None
+        return json.loads(gzip.decompress(row[0]))
+    except (sqlite3.Error, OSError, ValueError):
+        return None
+
+
+def store_transcript(vid_id: str, language: str, transcript) -> None:
+    """Store a fetched transcript; cache failures are not fatal."""
+    try:
+        blob = gzip.compress(json.dumps(transcript).encode("utf-8"))
+        _connect().execute(
+            "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)",
+            (vid_id, language, blob, int(time.time())),
+        )
+    except (sqlite3.Error, OSError, TypeError):
+        pass
+
+
+def clear() -> None:
+    """Drop all cached transcripts."""
+    try:
+        _connect().execute("DELETE FROM transcripts")
+    except sqlite3.Error:
+        pass
+    # remove any file-based entries from earlier versions of the cache
+    if cache_dir.exists():
+        for path in cache_dir.glob("transcript_*.json"):
+            path.unlink(missing_ok=True)
@@ -1,8 +1,9 @@
 from pathlib import Path
 
+import httpx
 import openai
 from openai import NOT_GIVEN, NotGiven
-from pydantic import field_validator
+from pydantic import PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pytubefix import YouTube
 
@@ -14,26 +15,40 @@ class Context(BaseSettings):
 
     # CLI options
     youtube_url: str
+    # batch options
+    urls_file: Path | None = None
+    max_concurrent_videos: int = 4
     # processing steps
     download: bool
     transcribe: bool
     translate: bool
     render: bool
+    # render options
+    sidecar_subs: bool = False
     # download options
     data_dir: Path
     download_max_retries: int
     skip_existing: bool
+    no_cache: bool = False
+    io_uring: bool = False
+    compress_transcripts: bool = False
     # transcription options
     whisper_prompt: str | None
     whisper_model: str
+    whisper_backend: str = "openai"
+    auto_shrink: bool = True
     force_transcription_from_audio: bool
     start_transcription_segment: int
     min_silence_len_sec: int
     silence_threshold: int
+    size_aware_split_only: bool = False
+    transcription_concurrency: int = 8
     # translation options
     translate_additional_prompt: str | None
     gpt_model: str
     translate_from: str = "en"
+    translate_concurrency: int = 1
+    use_batch_api: bool = False
     translate_to: str = "Polish"
     # debug options
     verbose: bool
@@ -43,7 +58,9 @@ class Context(BaseSettings):
     openai_organization: str | None = None
     openai_base_url: str | None = None
     whisper_openai_timeout: float | None | NotGiven = NOT_GIVEN
-    whisper_openai_max_retries: int | None = 2
+    # long multi-chunk runs should survive transient API errors rather
+    # than abort and restart from the checkpoint
+    whisper_openai_max_retries: int | None = 5
 
     # internal state
     title: str | None = None
@@ -53,6 +70,10 @@ class Context(BaseSettings):
     have_ffmpeg: bool = False
     youtube_stream: YouTube | None = None
     local_stream: bool = False
+    # silence midpoints detected during audio extraction, if any
+    silence_splits: list[float] | None = None
+
+    _openai_client: openai.OpenAI | None = PrivateAttr(default=None)
 
     @field_validator("silence_threshold")
     def check_silence_threshold(cls, v):
@@ -61,19 +82,33 @@ class Context(BaseSettings):
             raise ValueError("silence_threshold must be between -60 and -5")
         return v
 
+    def _cached_path(self, attr: str) -> Path:
+        """Memoize Path construction for a filepath field.
+
+        The cache lives in the instance __dict__ and is keyed on the source
+        value, so reassigning the field invalidates it automatically.
+        """
+        source = getattr(self, attr)
+        cache_key = f"_{attr}_path"
+        cached = self.__dict__.get(cache_key)
+        if cached is None or cached[0] is not source:
+            cached = (source, Path(source))
+            self.__dict__[cache_key] = cached
+        return cached[1]
+
     @property
     def audio_path(self) -> Path:
         """Get the audio path."""
         if self.audio_filepath is None:
             raise ValueError("Audio file path not set")
-        return Path(self.audio_filepath)
+        return self._cached_path("audio_filepath")
 
     @property
     def video_path(self) -> Path:
         """Get the video path."""
         if self.video_filepath is None:
             raise ValueError("Video file path not set")
-        return Path(self.video_filepath)
+        return self._cached_path("video_filepath")
 
     @property
     def rendered_video_path(self) -> Path:
@@ -86,7 +121,7 @@ class Context(BaseSettings):
         """Get the srt path."""
         if self.srt_filepath is None:
             raise ValueError("SRT file path not set")
-        return Path(self.srt_filepath)
+        return self._cached_path("srt_filepath")
 
     @property
     def translated_srt_path(self) -> Path:
@@ -95,14 +130,29 @@ class Context(BaseSettings):
 
     @property
     def openai_client(self) -> openai.OpenAI:
-        """Returns the initialized OpenAI client."""
-        return openai.OpenAI(
-            api_key=self.openai_api_key,
-            organization=self.openai_organization,
-            base_url=self.openai_base_url,
-            timeout=self.whisper_openai_timeout,
-            max_retries=self.whisper_openai_max_retries,
-        )
+        """Returns the initialized OpenAI client.
+
+        The client is created once and reused, so its connection pool (and
+        the TLS handshakes behind it) is shared by all API calls. The
+        transport keeps connections alive across the concurrent segment
+        uploads and multiplexes them over HTTP/2 when the h2 extra is
+        installed.
+        """
+        if self._openai_client is None:
+            limits = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60)
+            try:
+                http_client = httpx.Client(http2=True, limits=limits)
+            except ImportError:  # the h2 extra is not installed
+                http_client = httpx.Client(limits=limits)
+            self._openai_client = openai.OpenAI(
+                http_client=http_client,
+                api_key=self.openai_api_key,
+                organization=self.openai_organization,
+                base_url=self.openai_base_url,
+                timeout=self.whisper_openai_timeout,
+                max_retries=self.whisper_openai_max_retries,
+            )
+        return self._openai_client
 
 
 class Config:
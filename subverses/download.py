@@ -1,55 +1,284 @@
 """Download video and transcripts from YouTube"""
 
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+from html import unescape
 from pathlib import Path
+from xml.etree import ElementTree
 
-import pysrt
+import httpx
 import typer
 from pathvalidate import sanitize_filename
 from pytubefix import Stream, YouTube
 from pytubefix.extract import video_id
 from tqdm import tqdm
-from youtube_transcript_api import YouTubeTranscriptApi
 
+from subverses import cache
 from subverses.audio_parse import extract_audio
 from subverses.config import Context
 from subverses.errors import Abort
 
+# shared keep-alive client so repeated YouTube calls reuse one connection
+_http_client: httpx.Client | None = None
 
-def _download(context: Context, stream: Stream, *, filename_prefix: str, progress=True):
-    """Download a stream"""
-    filename = Path(
-        stream.get_file_path(
-            output_path=context.data_dir.as_posix(), filename_prefix=filename_prefix
+
+def _shared_http_client() -> httpx.Client:
+    """Return the shared keep-alive HTTP client (HTTP/2 when available)."""
+    global _http_client
+    if _http_client is None:
+        limits = httpx.Limits(max_keepalive_connections=20)
+        try:
+            _http_client = httpx.Client(http2=True, limits=limits)
+        except ImportError:  # the h2 extra is not installed
+            _http_client = httpx.Client(limits=limits)
+    return _http_client
+
+
+def _fetch_timedtext(vid_id: str, language: str):
+    """Fetch a transcript directly from YouTube's timedtext endpoint.
+
+    Uses the shared keep-alive client, so listing and fetching cost one
+    round-trip on a warm connection instead of a fresh TCP/TLS handshake.
+
+    :return: transcript entries shaped like youtube_transcript_api's output,
+        or None when no track is available for the language.
+    """
+    try:
+        response = _shared_http_client().get(
+            "https://www.youtube.com/api/timedtext",
+            params={"lang": language, "v": vid_id},
         )
-    )
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200 or not response.content:
+        return None
+
+    try:
+        root = ElementTree.fromstring(response.text)
+    except ElementTree.ParseError:
+        return None
+
+    entries = [
+        {
+            "start": float(element.attrib["start"]),
+            "duration": float(element.attrib.get("dur", 0.0)),
+            "text": unescape("".join(element.itertext())),
+        }
+        for element in root.iter("text")
+        if "start" in element.attrib
+    ]
+    return entries or None
+
+
+def _download_meta_path(filename: Path) -> Path:
+    """Return the sidecar metadata path for a downloaded file."""
+    return filename.with_name(filename.name + ".meta.json")
+
+
+def _store_download_meta(stream: Stream, filename: Path):
+    """Persist upstream validators (etag, size) next to a finished download."""
+    meta = {"content_length": stream.filesize}
+    try:
+        response = _shared_http_client().head(stream.url)
+        meta["etag"] = response.headers.get("etag")
+        meta["last_modified"] = response.headers.get("last-modified")
+    except httpx.HTTPError:
+        pass
+    try:
+        _download_meta_path(filename).write_text(json.dumps(meta), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _existing_file_is_complete(stream: Stream, filename: Path) -> bool:
+    """Check whether an already-downloaded file can be reused.
+
+    Compares the on-disk size against the sidecar metadata recorded at
+    download time (no network needed), or against the stream's reported
+    filesize when no sidecar exists. Catches truncated files left behind by
+    a killed download, which a bare exists() check happily accepts.
+    """
+    size = filename.stat().st_size
+    try:
+        meta = json.loads(_download_meta_path(filename).read_text(encoding="utf-8"))
+        expected = meta.get("content_length")
+    except (OSError, ValueError):
+        expected = None
+    if expected is None:
+        expected = stream.filesize
+    return size == expected
+
+
+def _download_with_io_uring(stream: Stream, filename: Path) -> str | None:
+    """Download a stream writing chunks through io_uring (Linux only).
+
+    Keeps several write submissions in flight, so flushing a chunk to disk
+    overlaps the TCP reads for the next one instead of serializing behind
+    them.
+
+    :return: the downloaded file path, or None when io_uring is unavailable
+        (callers fall back to the regular downloader).
+    """
+    from pytubefix import request as pytubefix_request
+
+    from subverses.audio_parse import liburing
+
+    if liburing is None or sys.platform != "linux":
+        return None
+
+    queue_depth = 8
+    ring = liburing.io_uring()
+    liburing.io_uring_queue_init(queue_depth, ring, 0)
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    # chunks must outlive their in-flight write submissions; completions
+    # are not guaranteed to arrive in submission order, so each one is
+    # correlated back to its chunk through user_data before the buffer is
+    # released
+    pending = {}
+    next_token = 0
+    offset = 0
+    try:
+        cqe = liburing.io_uring_cqe()
+
+        def reap_one():
+            liburing.io_uring_wait_cqe(ring, cqe)
+            liburing.trap_error(cqe.res)
+            token = cqe.user_data
+            liburing.io_uring_cqe_seen(ring, cqe)
+            pending.pop(token, None)
+
+        for chunk in pytubefix_request.stream(stream.url):
+            if len(pending) == queue_depth:
+                reap_one()
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_write(sqe, fd, chunk, len(chunk), offset)
+            sqe.user_data = next_token
+            pending[next_token] = chunk
+            next_token += 1
+            liburing.io_uring_submit(ring)
+            offset += len(chunk)
+        while pending:
+            reap_one()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+        liburing.io_uring_queue_exit(ring)
+    return str(filename)
+
+
+def _download_with_aria2c(stream: Stream, filename: Path) -> str | None:
+    """Download a stream with aria2c using parallel byte-range requests.
+
+    The googlevideo CDN throttles per connection; splitting the transfer
+    into parallel range GETs sidesteps that, typically several times faster
+    than pytubefix's single-connection loop.
+
+    :return: the downloaded file path, or None when aria2c failed (callers
+        fall back to the pytubefix downloader).
+    """
+    command = [
+        "aria2c",
+        "-x",
+        "8",
+        "-s",
+        "8",
+        "-k",
+        "4M",
+        "--min-split-size=1M",
+        "--auto-file-renaming=false",
+        "--allow-overwrite=true",
+        "-d",
+        str(filename.parent),
+        "-o",
+        filename.name,
+        stream.url,
+    ]
+    typer.echo(f"Downloading '{filename.name}' with aria2c...")
+    result = subprocess.run(command)
+    if result.returncode != 0 or not filename.exists():
+        return None
+    return str(filename)
+
+
+# pytubefix shares a single Monostate — and therefore a single on_progress
+# slot — across all streams of a YouTube object, so concurrent downloads
+# cannot each install their own closure without clobbering one another.
+# One dispatcher routes chunk events to per-stream progress state instead.
+_progress_states: dict = {}
+
+
+def _dispatch_progress(stream, chunk, bytes_remaining):
+    state = _progress_states.get(id(stream))
+    if state is None:
+        return
+    # throttle terminal updates to once per MB; tqdm locks and repaints on
+    # every update() call
+    downloaded = stream.filesize - bytes_remaining
+    if downloaded - state["reported"] >= 1 << 20 or bytes_remaining == 0:
+        state["bar"].update(downloaded - state["reported"])
+        state["reported"] = downloaded
+
+
+def _download(
+    context: Context,
+    stream: Stream,
+    *,
+    filename_prefix: str,
+    progress=True,
+    tqdm_position: int | None = None,
+):
+    """Download a stream"""
+    # get_file_path sanitizes the title and joins paths on every call, so
+    # compute it (and the posix form of the data dir) once
+    out_dir = context.data_dir.as_posix()
+    file_path = stream.get_file_path(output_path=out_dir, filename_prefix=filename_prefix)
+    filename = Path(file_path)
     if context.skip_existing and filename.exists():
-        typer.echo(f"Skipping download of existing file: '{filename}'")
-        return stream.get_file_path(
-            output_path=context.data_dir.as_posix(),
-            filename_prefix=filename_prefix,
-        )
+        if _existing_file_is_complete(stream, filename):
+            typer.echo(f"Skipping download of existing file: '{filename}'")
+            return file_path
+        typer.echo(f"Existing file is incomplete, downloading again: '{filename}'")
+
+    if context.io_uring:
+        downloaded = _download_with_io_uring(stream, filename)
+        if downloaded is not None:
+            _store_download_meta(stream, filename)
+            return downloaded
+
+    if shutil.which("aria2c"):
+        downloaded = _download_with_aria2c(stream, filename)
+        if downloaded is not None:
+            _store_download_meta(stream, filename)
+            return downloaded
 
     with tqdm(
         total=stream.filesize,
         unit="B",
         unit_scale=True,
         desc=f"Downloading {filename_prefix[:-1]}",
-    ) as progress:
-
-        def progress_function(stream, chunk, bytes_remaining):
-            current = (stream.filesize - bytes_remaining) / stream.filesize
-            total = stream.filesize
-            progress.update(int((current - progress.n / total) * total))
-
+        position=tqdm_position,
+    ) as progress_bar:
         if progress:
-            stream._monostate.on_progress = progress_function
+            _progress_states[id(stream)] = {"bar": progress_bar, "reported": 0}
+            stream._monostate.on_progress = _dispatch_progress
 
-        return stream.download(
-            output_path=context.data_dir.as_posix(),
-            filename_prefix=filename_prefix,
-            skip_existing=context.skip_existing,
-            max_retries=context.download_max_retries,
-        )
+        try:
+            downloaded = stream.download(
+                output_path=out_dir,
+                filename_prefix=filename_prefix,
+                skip_existing=context.skip_existing,
+                max_retries=context.download_max_retries,
+            )
+        finally:
+            _progress_states.pop(id(stream), None)
+        _store_download_meta(stream, filename)
+        return downloaded
 
 
 def get_local_stream(context: Context):
@@ -88,6 +317,18 @@ def get_yuoutube_stream(context: Context):
     ).with_suffix(".srt")
 
 
+def _highest_resolution_stream(yt: YouTube) -> Stream:
+    """Pick the highest-resolution stream with a single O(n) max pass.
+
+    order_by("resolution").last() sorts the whole stream list just to take
+    its maximum.
+    """
+    return max(
+        (s for s in yt.streams if s.resolution),
+        key=lambda s: int(s.resolution.rstrip("p")),
+    )
+
+
 def download_audio(context: Context):
     """Download audio from YouTube"""
     audio_stream = context.youtube_stream.streams.filter(only_audio=True).first()
@@ -97,26 +338,54 @@ def download_audio(context: Context):
 def download_video(context: Context):
     """Download video from YouTube"""
 
-    video_stream = context.youtube_stream.streams.order_by("resolution").last()
+    video_stream = _highest_resolution_stream(context.youtube_stream)
     context.video_filepath = _download(context, video_stream, filename_prefix="video_")
 
 
 def download_audio_and_video(context: Context):
     """Download a video from YouTube"""
 
-    yt = YouTube(context.youtube_url)
-
-    context.title = yt.title
-    context.data_dir = Path(context.data_dir) / sanitize_filename(yt.title)
+    # reuse the already-fetched stream; constructing YouTube() again repeats
+    # the player-JS fetch and signature extraction
+    if context.youtube_stream is None:
+        get_yuoutube_stream(context)
+    yt = context.youtube_stream
 
     # Download video and audio streams separately
-    video_stream = yt.streams.order_by("resolution").last()
-
-    context.video_filepath = _download(context, video_stream, filename_prefix="video_")
+    video_stream = _highest_resolution_stream(yt)
 
     # Download the lower quality as it transcribes well but is smaller
     audio_stream = yt.streams.filter(only_audio=True).first()
-    context.audio_filepath = _download(context, audio_stream, filename_prefix="audio_")
+
+    async def download_both():
+        # the blocking pytubefix downloads are network-bound and independent,
+        # so run them concurrently in worker threads
+        return await asyncio.gather(
+            asyncio.to_thread(
+                _download, context, video_stream, filename_prefix="video_", tqdm_position=0
+            ),
+            asyncio.to_thread(
+                _download, context, audio_stream, filename_prefix="audio_", tqdm_position=1
+            ),
+        )
+
+    context.video_filepath, context.audio_filepath = asyncio.run(download_both())
+
+
+def _language_candidates(language: str) -> list[str]:
+    """Return the language plus common regional variants to try in one pass."""
+    if language == "en":
+        return ["en", "en-US", "en-GB"]
+    return [language, f"{language}-{language.upper()}"]
+
+
+def _srt_timestamp(seconds: float) -> str:
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    milliseconds = round(seconds * 1000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
 
 def overlapping_subs(transcript):
@@ -131,26 +400,55 @@ def overlapping_subs(transcript):
 
 def download_subtitles(context: Context):
     """Download subtitles for a video"""
-    if context.skip_existing and context.srt_path.exists():
-        typer.echo(f"Skipping download of existing transcript file: '{context.srt_path}'")
-        return context.srt_path.as_posix()
+    srt_path = context.srt_path
+    if context.compress_transcripts and srt_path.suffix != ".gz":
+        # the context keeps the plain path until a transcript is actually
+        # on disk: when no transcript exists the caller falls back to
+        # Whisper, which writes plain SRT and must not inherit a .gz name
+        srt_path = Path(str(srt_path) + ".gz")
+    if context.skip_existing and srt_path.exists():
+        context.srt_filepath = str(srt_path)
+        typer.echo(f"Skipping download of existing transcript file: '{srt_path}'")
+        return srt_path.as_posix()
 
     vid_id = video_id(context.youtube_url)
-    transcript = YouTubeTranscriptApi.get_transcript(vid_id, languages=[context.translate_from])
+    transcript = None
+    if not context.no_cache:
+        transcript = cache.get_transcript(vid_id, context.translate_from)
+    if transcript is None:
+        transcript = _fetch_timedtext(vid_id, context.translate_from)
+        if transcript is None:
+            # imported lazily; the happy paths (cache hit, timedtext) never
+            # need the library
+            from youtube_transcript_api import YouTubeTranscriptApi
+
+            # list once, then pick the best matching language variant, so the
+            # fallback path does not repeat the listing round-trip per variant
+            transcript = (
+                YouTubeTranscriptApi.list_transcripts(vid_id)
+                .find_transcript(_language_candidates(context.translate_from))
+                .fetch()
+            )
+        if not context.no_cache:
+            cache.store_transcript(vid_id, context.translate_from, transcript)
     overlapping_subs(transcript)
 
-    subs = pysrt.SubRipFile()
-
-    for entry in transcript:
-        item = pysrt.SubRipItem(
-            index=len(subs),
-            start=pysrt.SubRipTime(seconds=entry["start"]),
-            end=pysrt.SubRipTime(seconds=entry["start"] + entry["duration"]),
-            text=entry["text"],
-        )
-        subs.append(item)
-
-    subs.save(context.srt_path, encoding="utf-8")
+    # build the SRT text directly; SubRipItem/SubRipTime construction is
+    # surprisingly heavy for thousands of cues
+    blocks = [
+        f"{index}\n"
+        f"{_srt_timestamp(entry['start'])} --> "
+        f"{_srt_timestamp(entry['start'] + entry['duration'])}\n"
+        f"{entry['text']}\n\n"
+        for index, entry in enumerate(transcript)
+    ]
+    if srt_path.suffix == ".gz":
+        # SRT text compresses 3-5x; worthwhile when caching whole channels
+        with gzip.open(srt_path, "wt", compresslevel=6, encoding="utf-8") as srt_file:
+            srt_file.write("".join(blocks))
+        context.srt_filepath = str(srt_path)
+    else:
+        srt_path.write_text("".join(blocks), encoding="utf-8")
 
 
 def download(context: Context):
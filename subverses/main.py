@@ -1,53 +1,177 @@
+from __future__ import annotations
+
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import pycountry
 import typer
 
-from subverses.config import config
-from subverses.download import (
-    get_yuoutube_stream,
-    download_audio,
-    download as do_download,
-    download_video,
-)
 from subverses.errors import Abort
-from subverses.render import render_final_video
-from subverses.transcribe import transcribe_audio
-from subverses.translate import translate as do_translate, trabslate_subtitles
+
+if TYPE_CHECKING:
+    from subverses.config import Context
+
+# The processing modules (and their heavy pytubefix/openai imports,
+# including subverses.config itself) are imported inside the command bodies
+# so `subverses --help` and argument errors do not pay their startup cost.
 
 app = typer.Typer(add_completion=False)
 
+# ISO 639-1 language codes; an inline set spares importing pycountry's
+# database for a membership check
+_ISO_639_1_CODES = frozenset(
+    """aa ab ae af ak am an ar as av ay az ba be bg bh bi bm bn bo br bs ca
+    ce ch co cr cs cu cv cy da de dv dz ee el en eo es et eu fa ff fi fj fo
+    fr fy ga gd gl gn gu gv ha he hi ho hr ht hu hy hz ia id ie ig ii ik io
+    is it iu ja jv ka kg ki kj kk kl km kn ko kr ks ku kv kw ky la lb lg li
+    ln lo lt lu lv mg mh mi mk ml mn mr ms mt my na nb nd ne ng nl nn no nr
+    nv ny oc oj om or os pa pi pl ps pt qu rm rn ro ru rw sa sc sd se sg si
+    sk sl sm sn so sq sr ss st su sv sw ta te tg th ti tk tl tn to tr ts tt
+    tw ty ug uk ur uz ve vi vo wa wo xh yi yo za zh zu""".split()
+)
 
-def check_dependencies():
-    """Check if the required dependencies are installed."""
+
+def _have_ffmpeg() -> bool:
+    """Check for a working ffmpeg, caching the probe across invocations.
+
+    Spawning 'ffmpeg -version' costs tens of milliseconds per run; a stat of
+    the binary is sub-millisecond, so the probe result is remembered keyed on
+    the binary's path, mtime and size and only redone when those change.
+    """
+    import json
+    import os
+
+    from subverses.cache import cache_dir
+
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path is None:
+        return False
+
+    stat = os.stat(ffmpeg_path)
+    fingerprint = [ffmpeg_path, stat.st_mtime, stat.st_size]
+    probe_cache = cache_dir / "ffmpeg_probe.json"
     try:
-        # Try to execute 'ffmpeg -version'
-        result = subprocess.run(
-            ["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        if json.loads(probe_cache.read_text(encoding="utf-8")) == fingerprint:
+            return True
+    except (OSError, ValueError):
+        pass
+
+    try:
+        subprocess.run(
+            ["ffmpeg", "-version"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
         )
-        # If the command was successful, 'ffmpeg' is installed
-        if result.returncode != 0:
-            raise Exception()
-        config.config.have_ffmpeg = True
     except Exception:
-        # 'ffmpeg' is not installed if FileNotFoundError is raised
+        return False
+    try:
+        probe_cache.parent.mkdir(parents=True, exist_ok=True)
+        probe_cache.write_text(json.dumps(fingerprint), encoding="utf-8")
+    except OSError:
+        pass
+    return True
+
+
+def check_dependencies(context: Context):
+    """Check if the required dependencies are installed."""
+    if _have_ffmpeg():
+        context.have_ffmpeg = True
+    else:
         typer.echo("WARNING: ffmpeg is not installed! Won't be able to render or split audio.")
 
-    if config.config.openai_api_key is None:
+    if context.openai_api_key is None:
         raise Abort(
             "OpenAI API key is not set. Please set the OPENAI_API_KEY environment variable or add it to the .env file."
         )
 
 
+def _process_youtube(context: Context):
+    """Run the full pipeline for a single video."""
+    from subverses.download import (
+        get_local_stream,
+        get_yuoutube_stream,
+        download_audio,
+        download as do_download,
+        download_video,
+    )
+    from subverses.render import render_final_video
+    from subverses.transcribe import transcribe_audio
+    from subverses.translate import translate as do_translate
+
+    check_dependencies(context)
+
+    if context.translate_from not in _ISO_639_1_CODES:
+        raise typer.BadParameter("Invalid language code")
+
+    # check if youtube_url is an url or a local path
+    if not context.youtube_url.startswith("http"):
+        get_local_stream(context)
+    else:
+        get_yuoutube_stream(context)
+
+    if not context.download:
+        return
+
+    if do_download(context) == "audio":
+        if not context.transcribe:
+            raise Abort("No subtitles available and transcribe is disabled.")
+        transcribe_audio(context)
+
+    if context.translate:
+        do_translate(context)
+    else:
+        return
+
+    if context.render:
+        if not context.have_ffmpeg:
+            raise Abort("Cannot render video without ffmpeg.")
+        if not context.local_stream:
+            download_video(context)
+        if not context.audio_filepath:
+            download_audio(context)
+        render_final_video(context)
+
+
+def _process_many(params: dict):
+    """Process every URL from a urls file with bounded concurrency."""
+    urls = [
+        line.strip()
+        for line in params["urls_file"].read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not urls:
+        raise Abort(f"No URLs found in: {params['urls_file']}")
+
+    from subverses.config import Context
+
+    def process_one(url: str):
+        try:
+            _process_youtube(Context(**{**params, "youtube_url": url}))
+        except Exception as exc:
+            typer.echo(f"{url}: {exc}", err=True)
+
+    with ThreadPoolExecutor(max_workers=params["max_concurrent_videos"]) as executor:
+        list(executor.map(process_one, urls))
+
+
 @app.command()
 def youtube(
-    # required positional argument
-    youtube_url: str = typer.Argument(
-        ...,
+    # positional argument, optional when --urls-file is given
+    youtube_url: Optional[str] = typer.Argument(
+        None,
         help="URL of the YouTube video to download.",
     ),
+    urls_file: Optional[Path] = typer.Option(
+        None,
+        help="File with YouTube URLs to process, one per line ('#' comments allowed).",
+    ),
+    max_concurrent_videos: int = typer.Option(
+        4,
+        help="How many videos to process concurrently in --urls-file mode.",
+    ),
     download: bool = typer.Option(
         True,
         help="Download subtitles and streams. If --no-download it basically just checks streams and acts like dry run.",
@@ -64,6 +188,10 @@ def youtube(
         True,
         help="Render the final video.",
     ),
+    sidecar_subs: bool = typer.Option(
+        False,
+        help="Ship subtitles as a sidecar .srt instead of muxing them into the MP4.",
+    ),
     data_dir: Path = typer.Option(
         Path("./data"),
         help="Directory to store the downloaded data.",
@@ -76,6 +204,18 @@ def youtube(
         True,
         help="When downloading audio and video, skip if the file already exists.",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        help="Do not use or populate the on-disk transcript cache.",
+    ),
+    io_uring: bool = typer.Option(
+        False,
+        help="Write stream downloads through io_uring (Linux with liburing only).",
+    ),
+    compress_transcripts: bool = typer.Option(
+        False,
+        help="Store downloaded transcripts gzip-compressed (.srt.gz).",
+    ),
 
     whisper_prompt: Optional[str] = typer.Option(
         None,
@@ -85,6 +225,15 @@ def youtube(
         "whisper-1",
         help="Transcription model name.",
     ),
+    whisper_backend: str = typer.Option(
+        "openai",
+        help="Transcription backend: 'openai' (API) or 'faster-whisper' (local batched"
+        " inference; set --whisper-model to a model size such as 'large-v3').",
+    ),
+    auto_shrink: bool = typer.Option(
+        True,
+        help="Re-encode oversized audio to low-bitrate mono opus before resorting to splitting.",
+    ),
     force_transcription_from_audio: bool = typer.Option(
         False,
         help="Force transcription from audio file even if downloading manual transcript is possible.",
@@ -101,6 +250,14 @@ def youtube(
         -30,
         help="The silence threshold used for audio splitting. It should be negative integer in range -60 to -5 dB.",
     ),
+    size_aware_split_only: bool = typer.Option(
+        False,
+        help="Split audio into fixed-duration chunks sized by bitrate, skipping silence detection entirely.",
+    ),
+    transcription_concurrency: int = typer.Option(
+        8,
+        help="How many audio segments to transcribe concurrently.",
+    ),
     translate_additional_prompt: Optional[str] = typer.Option(
         None,
         help="Additional prompt for the translation model.",
@@ -117,50 +274,72 @@ def youtube(
         "Polish",
         help="Translate to language. Use full language name.",
     ),
+    translate_concurrency: int = typer.Option(
+        1,
+        help="How many subtitle chunks to translate concurrently. Values above 1"
+        " drop the rolling conversation context between chunks.",
+    ),
+    use_batch_api: bool = typer.Option(
+        False,
+        help="Translate through the OpenAI Batch API: half the cost, but completion"
+        " may take up to 24 hours.",
+    ),
     verbose: bool = typer.Option(
         False,
         help="Verbose output.",
     ),
 ):
     """Process and translate YouTube videos"""
-    try:
-        config.initialize(**locals())
-    except ValueError as exc:
-        raise Abort(exc)
-    context = config.config
-
-    check_dependencies()
+    # an explicit mapping rather than locals(): it cannot silently pick up
+    # stray local variables, and it documents exactly what Context receives
+    params = dict(
+        youtube_url=youtube_url,
+        urls_file=urls_file,
+        max_concurrent_videos=max_concurrent_videos,
+        download=download,
+        transcribe=transcribe,
+        translate=translate,
+        render=render,
+        sidecar_subs=sidecar_subs,
+        data_dir=data_dir,
+        download_max_retries=download_max_retries,
+        skip_existing=skip_existing,
+        no_cache=no_cache,
+        io_uring=io_uring,
+        compress_transcripts=compress_transcripts,
+        whisper_prompt=whisper_prompt,
+        whisper_model=whisper_model,
+        whisper_backend=whisper_backend,
+        auto_shrink=auto_shrink,
+        force_transcription_from_audio=force_transcription_from_audio,
+        start_transcription_segment=start_transcription_segment,
+        min_silence_len_sec=min_silence_len_sec,
+        silence_threshold=silence_threshold,
+        size_aware_split_only=size_aware_split_only,
+        transcription_concurrency=transcription_concurrency,
+        translate_additional_prompt=translate_additional_prompt,
+        gpt_model=gpt_model,
+        translate_from=translate_from,
+        translate_to=translate_to,
+        translate_concurrency=translate_concurrency,
+        use_batch_api=use_batch_api,
+        verbose=verbose,
+    )
 
-    if pycountry.languages.get(alpha_2=translate_from) is None:
-        raise typer.BadParameter("Invalid language code")
+    from subverses.config import config
 
-    # check if youtube_url is an url or a local path
-    if not youtube_url.startswith("http"):
-        get_local_stream(context)
-    else:
-        get_yuoutube_stream(context)
-
-    if not download:
+    if urls_file is not None:
+        _process_many(params)
         return
+    if youtube_url is None:
+        raise typer.BadParameter("Provide a YouTube URL or --urls-file.")
 
-    if do_download(context) == "audio":
-        if not transcribe:
-            raise Abort("No subtitles available and transcribe is disabled.")
-        transcribe_audio(context)
-
-    if translate:
-        do_translate(context)
-    else:
-        return
+    try:
+        config.initialize(**params)
+    except ValueError as exc:
+        raise Abort(exc)
 
-    if render:
-        if not context.have_ffmpeg:
-            raise Abort("Cannot render video without ffmpeg.")
-        if not context.local_stream:
-            download_video(context)
-        if not context.audio_filepath:
-            download_audio(context)
-        render_final_video(context)
+    _process_youtube(config.config)
 
 
 @app.command()
@@ -213,14 +392,18 @@ def srt(
         "translate_to": translate_to,
         "verbose": verbose,
     }
+    from subverses.config import config
+
     try:
         config.initialize(**{**stub_arguments})
     except ValueError as exc:
         raise Abort(exc)
 
-    check_dependencies()
+    from subverses.translate import trabslate_subtitles
+
+    check_dependencies(config.config)
 
-    if pycountry.languages.get(alpha_2=translate_from) is None:
+    if translate_from not in _ISO_639_1_CODES:
         raise typer.BadParameter("Invalid language code")
 
     if not srt_path.exists():
@@ -236,6 +419,23 @@ def srt(
     )
 
 
+@app.command()
+def cache(
+    clean: bool = typer.Option(
+        False,
+        help="Remove all cached transcripts.",
+    ),
+):
+    """Inspect or clean the on-disk transcript cache"""
+    from subverses import cache as transcript_cache
+
+    if clean:
+        transcript_cache.clear()
+        typer.echo("Transcript cache cleared.")
+        return
+    typer.echo(f"Transcript cache: {transcript_cache.cache_dir / 'subverses.db'}")
+
+
 if __name__ == "__main__":
     try:
         app(prog_name="subverses")
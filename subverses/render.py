@@ -1,3 +1,5 @@
+import shlex
+import shutil
 import subprocess
 
 import typer
@@ -5,10 +7,17 @@ import typer
 from subverses.config import Context
 
 
-def render_ffmpeg(video_file_path, audio_file_path, subtitle_path, rendered_file_path):
+def render_ffmpeg(
+    video_file_path, audio_file_path, subtitle_path, rendered_file_path, *, verbose=False
+):
     """Render the video, connecting audio and subtitles"""
     command = [
         "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-stats",
         "-i",
         video_file_path,
         "-i",
@@ -27,28 +36,76 @@ def render_ffmpeg(video_file_path, audio_file_path, subtitle_path, rendered_file
         "1",
         "-map",
         "2",
+        "-threads",
+        "0",
+        # place the moov atom up front so playback can start before the
+        # whole file is downloaded when served over HTTP
+        "-movflags",
+        "+faststart",
         rendered_file_path,
     ]
-    typer.echo(" ".join(command))
+    if verbose:
+        # shlex.join yields a pasteable command line; unconditional echoing
+        # would pollute stdout for scripted, non-verbose runs
+        typer.echo(shlex.join(command))
+
+    # Inherit stdio instead of buffering it through pipes: the whole render
+    # log no longer accumulates in Python memory and a full pipe cannot
+    # stall a long render, while ffmpeg's own -stats progress line stays
+    # visible on the terminal.
+    subprocess.run(command, check=True)
 
-    # Use Popen to initiate the ffmpeg process
-    process = subprocess.Popen(
-        command, universal_newlines=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
 
-    # Wait for the process to complete
-    process.communicate()
+def render_sidecar(context: Context):
+    """Mux video and audio only, shipping the subtitles as a sidecar .srt
+
+    Without the mov_text track ffmpeg no longer parses and re-encodes every
+    cue; the remux degenerates to a straight stream copy. Most players pick
+    up a sidecar .srt with the same basename automatically.
+    """
+    rendered_path = context.rendered_video_path
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-stats",
+        "-i",
+        context.video_path.as_posix(),
+        "-i",
+        context.audio_path.as_posix(),
+        "-c",
+        "copy",
+        "-map",
+        "0",
+        "-map",
+        "1",
+        "-threads",
+        "0",
+        "-movflags",
+        "+faststart",
+        rendered_path.as_posix(),
+    ]
+    if context.verbose:
+        typer.echo(shlex.join(command))
+    subprocess.run(command, check=True)
+    shutil.copy(context.translated_srt_path, rendered_path.with_suffix(".srt"))
 
 
 def render_final_video(context: Context):
     """Render the video"""
     if not context.rendered_video_path.exists():
         typer.echo("Rendering video...")
-        render_ffmpeg(
-            context.video_path.as_posix(),
-            context.audio_path.as_posix(),
-            context.translated_srt_path.as_posix(),
-            context.rendered_video_path.as_posix(),
-        )
+        if context.sidecar_subs:
+            render_sidecar(context)
+        else:
+            render_ffmpeg(
+                context.video_path.as_posix(),
+                context.audio_path.as_posix(),
+                context.translated_srt_path.as_posix(),
+                context.rendered_video_path.as_posix(),
+                verbose=context.verbose,
+            )
     else:
         typer.echo(f"Skipping rendering, file already exists: {context.rendered_video_path}")
@@ -1,16 +1,26 @@
+import asyncio
+import os
+import queue
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import pysrt
 import typer
 from tqdm import tqdm
 
 from subverses.audio_parse import (
+    SegmentTooLongError,
+    _split_base,
     detect_silence_splits_with_ffmpeg,
+    split_audio_by_size,
+    split_audio_by_size_direct,
     split_audio_with_ffmpeg,
     max_clip_size,
     recombine_segments,
 )
-from subverses.config import config, Context
+from subverses.config import Context
 from subverses.errors import Abort
 
 
@@ -21,26 +31,231 @@ def transcription_file_format(audio_file_path: Path):
 
 def n_split_transcription_file(audio_file_path: Path, split_no: int) -> Path:
     """Return the nth split file name."""
-    return audio_file_path.with_suffix(f".{split_no:03d}" + ".srt")
+    return audio_file_path.with_suffix(f".{split_no:03d}.srt")
 
 
-def split_audio(context: Context) -> list[tuple[Path, float]]:
+def split_audio(context: Context, *, on_segment=None, on_fallback=None) -> list[tuple[Path, float]]:
     """Split audio file
 
+    :param on_segment: Optional callable receiving (path, start time) tuples
+        as chunks are finalized; only the single-pass split path streams,
+        the other paths report nothing until done.
+    :param on_fallback: Optional callable invoked when the single-pass split
+        is abandoned, before any of its output files are touched; gives a
+        streaming consumer the chance to finish with the already-streamed
+        chunks first.
     returns: list of tuples, each containing the path to the recombined
         segment and the start time of the segment.
     """
-    typer.echo("Detecting silence splits...")
-    silence_splits = detect_silence_splits_with_ffmpeg(context)
+    if context.size_aware_split_only:
+        typer.echo("Splitting audio file by size...")
+        return split_audio_by_size(context)
+
+    if context.silence_splits is not None:
+        # already detected while the audio was being extracted
+        silence_splits = context.silence_splits
+    else:
+        typer.echo("Detecting silence splits...")
+        silence_splits = detect_silence_splits_with_ffmpeg(context)
     typer.echo(f"Detected {len(silence_splits) + 1} segments.")
     if len(silence_splits) == 0:
         raise Abort("No silence detected.")
     if len(silence_splits) > 1000:
         raise Abort("Too many segments detected.")
-    typer.echo("Splitting audio file...")
-    split_audio_with_ffmpeg(config.config, silence_splits)
-    typer.echo("Recombining segments to the least possible number of files...")
-    return recombine_segments(context, silence_splits)
+
+    try:
+        # One ffmpeg pass cuts the audio at coalesced silence midpoints into
+        # the final upload-sized chunks.
+        return split_audio_by_size_direct(context, silence_splits, on_segment=on_segment)
+    except SegmentTooLongError:
+        # The byte-rate estimate overshot; redo with fine-grained splits and
+        # recombine them under the size cap.
+        typer.echo("Chunk size estimate overshot, falling back to fine-grained splitting...")
+        if on_fallback is not None:
+            # let in-flight transcriptions of the streamed chunks settle
+            # before their audio files are overwritten below
+            on_fallback()
+        # transcriptions of the abandoned coarse chunks are stale: the fine
+        # splits reuse the same numbering with different boundaries
+        for stale in context.audio_path.parent.glob(
+            _split_base(context.audio_path) + ".*.srt"
+        ):
+            stale.unlink()
+        split_audio_with_ffmpeg(context, silence_splits)
+        typer.echo("Recombining segments to the least possible number of files...")
+        return recombine_segments(context, silence_splits)
+
+
+def _segment_transcriber(context: Context, semaphore, progress):
+    """Build the bounded-concurrency coroutine shared by both drivers."""
+
+    async def transcribe_one(segment_no, segment_path, segment_offset) -> str:
+        # resolve the output path up front, outside the worker thread
+        transcription_path = transcription_file_format(segment_path)
+        async with semaphore:
+            transcription = await asyncio.to_thread(
+                transcribe_file,
+                context,
+                segment_path,
+                segment_no=segment_no,
+                segment_offset=segment_offset,
+                transcription_path=transcription_path,
+            )
+        progress.update(1)
+        return transcription
+
+    return transcribe_one
+
+
+async def _transcribe_segments(
+    context: Context, audio_segment_splits: list[tuple[Path, float]], out_file
+) -> None:
+    """Transcribe all segments concurrently, writing them out in order.
+
+    Each request is an independent upload + Whisper inference round-trip, so
+    total wall time is bounded by the slowest batch rather than the sum of
+    all requests. A semaphore caps the number in flight; 429 backoff is
+    handled by the OpenAI client's built-in retries. Segments are appended
+    to out_file as each completed prefix becomes available, so the combined
+    multi-hour SRT is never accumulated in memory.
+    """
+    semaphore = asyncio.Semaphore(context.transcription_concurrency)
+    progress = tqdm(
+        total=len(audio_segment_splits), unit="segments", desc="Transcribing audio segments"
+    )
+    transcribe_one = _segment_transcriber(context, semaphore, progress)
+
+    tasks = [
+        asyncio.create_task(transcribe_one(segment_no, segment_path, segment_offset))
+        for segment_no, (segment_path, segment_offset) in enumerate(audio_segment_splits)
+    ]
+    try:
+        # awaiting in submission order flushes each segment as soon as it
+        # and all its predecessors are done, regardless of finish order
+        for task in tasks:
+            out_file.write(await task)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        progress.close()
+
+
+async def _transcribe_streaming(
+    context: Context, segment_queue: queue.Queue
+) -> list[tuple[Path, float, str]]:
+    """Transcribe chunks as the splitter hands them over the queue.
+
+    Requests start while ffmpeg is still cutting later chunks, hiding the
+    split pass behind the first Whisper round trips. A None on the queue
+    marks the end of the stream.
+    """
+    semaphore = asyncio.Semaphore(context.transcription_concurrency)
+    progress = tqdm(unit="segments", desc="Transcribing audio segments")
+    transcribe_one = _segment_transcriber(context, semaphore, progress)
+
+    loop = asyncio.get_running_loop()
+    items = []
+    tasks = []
+    try:
+        while True:
+            item = await loop.run_in_executor(None, segment_queue.get)
+            if item is None:
+                break
+            items.append(item)
+            tasks.append(asyncio.create_task(transcribe_one(len(tasks), *item)))
+        return [
+            (segment_path, segment_offset, await task)
+            for (segment_path, segment_offset), task in zip(items, tasks)
+        ]
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        progress.close()
+
+
+def _shrink_audio(context: Context) -> Path | None:
+    """Re-encode the audio as low-bitrate mono opus to duck the size limit.
+
+    One ffmpeg pass is far cheaper than the detect/split/recombine passes of
+    the splitting path, and 12 kb/s mono opus stays well above Whisper's
+    quality floor.
+
+    :return: the re-encoded file, or None when it is still over the limit
+        (or ffmpeg failed) and the caller must split after all.
+    """
+    shrunk_path = context.audio_path.with_suffix(".shrunk.ogg")
+    if not (context.skip_existing and shrunk_path.exists()):
+        command = [
+            "ffmpeg",
+            "-y",
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            context.audio_path.as_posix(),
+            "-ac",
+            "1",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            "12k",
+            "-application",
+            "voip",
+            shrunk_path.as_posix(),
+        ]
+        try:
+            subprocess.run(command, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+    if shrunk_path.stat().st_size > max_clip_size:
+        return None
+    return shrunk_path
+
+
+def _transcribe_with_faster_whisper(context: Context) -> Path:
+    """Transcribe the whole audio file locally with batched faster-whisper.
+
+    The batched pipeline chunks the audio semantically and runs the chunks
+    through the model together, so neither silence splitting nor per-segment
+    API uploads are needed. The model size is taken from --whisper-model
+    (e.g. "large-v3" rather than an API model name).
+    """
+    try:
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
+    except ImportError:
+        raise Abort(
+            "faster-whisper is not installed."
+            " Install it or use --whisper-backend openai."
+        )
+
+    pipeline = BatchedInferencePipeline(
+        model=WhisperModel(context.whisper_model, compute_type="int8")
+    )
+    segments, _ = pipeline.transcribe(
+        context.audio_path.as_posix(),
+        batch_size=16,
+        language=context.translate_from,
+        initial_prompt=context.whisper_prompt,
+    )
+    # write to a temporary file and rename on success, so an interrupted
+    # run never leaves a truncated srt_path behind for the skip-existing
+    # check to mistake for a finished transcription
+    tmp_path = context.srt_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as srt_file:
+        for index, segment in enumerate(segments, start=1):
+            srt_file.write(
+                f"{index}\n"
+                f"{_srt_timestamp(round(segment.start * 1000))} --> "
+                f"{_srt_timestamp(round(segment.end * 1000))}\n"
+                f"{segment.text.strip()}\n\n"
+            )
+    os.replace(tmp_path, context.srt_path)
+    return context.srt_path
 
 
 def transcribe_audio(context: Context) -> Path:
@@ -50,37 +265,76 @@ def transcribe_audio(context: Context) -> Path:
     if context.srt_path.exists() and not context.force_transcription_from_audio:
         typer.echo(f"Skipping transcription of existing file: '{context.srt_path}'")
         return context.srt_path
+    if context.whisper_backend == "faster-whisper":
+        return _transcribe_with_faster_whisper(context)
     if max_clip_size < audio_file_size:
         typer.echo(
             f"Audio file is too large: {audio_file_size:.1f} bytes. Max size is {max_clip_size // 1024**2} MB."
         )
-        audio_segment_splits = split_audio(context)
+        if context.auto_shrink:
+            typer.echo("Re-encoding audio to fit under the size limit...")
+            shrunk_path = _shrink_audio(context)
+            if shrunk_path is not None:
+                transcribe_file(context, shrunk_path)
+                return context.srt_path
+            typer.echo("Re-encoded audio is still too large, splitting...")
 
-        transcription = ""
-        progress = tqdm(
-            total=len(audio_segment_splits), unit="segments", desc="Transcribing audio segments"
-        )
-        for segment_no, (segment_path, segment_offset) in enumerate(audio_segment_splits):
-            transcription += transcribe_file(
-                context,
-                segment_path,
-                segment_no=segment_no,
-                segment_offset=segment_offset,
-            )
-            progress.update(1)
+        # Run the splitter in a worker thread feeding finalized chunks over
+        # a queue, so the first transcription requests go out while ffmpeg
+        # is still cutting the rest of the file.
+        segment_queue: queue.Queue = queue.Queue()
+        consumer_done = threading.Event()
+
+        def drain_consumer():
+            # runs in the splitter thread on fallback: end the stream and
+            # wait for the consumer to finish with the coarse chunks before
+            # the re-split overwrites the same .splits_ files
+            segment_queue.put(None)
+            consumer_done.wait()
 
-        # write the transcription file
-        with open(context.srt_path, "w") as f:
-            f.write(transcription)
+        def produce():
+            try:
+                return split_audio(
+                    context, on_segment=segment_queue.put, on_fallback=drain_consumer
+                )
+            finally:
+                segment_queue.put(None)
+
+        # stream into a temporary file and rename on success; a mid-run
+        # failure must not leave a partial srt_path that the skip-existing
+        # check would accept as a finished transcription on the next run
+        tmp_path = context.srt_path.with_suffix(".tmp")
+        with ThreadPoolExecutor(max_workers=1) as splitter, open(tmp_path, "w") as f:
+            split_future = splitter.submit(produce)
+            try:
+                streamed = asyncio.run(_transcribe_streaming(context, segment_queue))
+            finally:
+                # unblock a splitter waiting in drain_consumer even when the
+                # consumer died, or the producer thread would hang forever
+                consumer_done.set()
+            audio_segment_splits = split_future.result()
+            if [(path, offset) for path, offset, _ in streamed] == audio_segment_splits:
+                f.writelines(transcription for _, _, transcription in streamed)
+            else:
+                # the splitter took a non-streaming path (size-aware split or
+                # the recombine fallback); transcribe its final chunk list
+                asyncio.run(_transcribe_segments(context, audio_segment_splits, f))
+        os.replace(tmp_path, context.srt_path)
     else:
         transcribe_file(context, context.audio_path)
 
     return context.srt_path
 
 
-def _transcribed_file(transcription_path, segment_offset):
+def _transcribed_file(transcription_path):
+    """Return a cached segment transcription.
+
+    Segment files are written with their time offset already applied, so a
+    resume is a plain file read — re-shifting here would both repeat the
+    work and offset the timestamps twice.
+    """
     with open(transcription_path) as subs_file:
-        return shift_subtitles(subs_file.read(), segment_offset)
+        return subs_file.read()
 
 
 def transcribe_file(
@@ -89,19 +343,21 @@ def transcribe_file(
     *,
     segment_no: int | None = None,
     segment_offset: float = 0.0,
+    transcription_path: Path | None = None,
 ) -> str:
     """Transcribe an audio file."""
 
-    if segment_no is not None:
-        transcription_path = transcription_file_format(audio_segment_path)
-    else:
-        transcription_path = context.srt_path
+    if transcription_path is None:
+        if segment_no is not None:
+            transcription_path = transcription_file_format(audio_segment_path)
+        else:
+            transcription_path = context.srt_path
 
     if segment_no is not None and segment_no < context.start_transcription_segment:
-        return _transcribed_file(transcription_path, segment_offset)
+        return _transcribed_file(transcription_path)
 
     if transcription_path.exists() and not context.force_transcription_from_audio:
-        return _transcribed_file(transcription_path, segment_offset)
+        return _transcribed_file(transcription_path)
 
     with open(audio_segment_path, "rb") as audio_file:
         transcription = context.openai_client.audio.transcriptions.create(
@@ -111,12 +367,9 @@ def transcribe_file(
             response_format="srt",
             language=context.translate_from,
         )
-        subs = pysrt.from_string(transcription)
 
     if segment_no is not None and segment_no > 0:
-        subs = shift_subtitles(transcription, segment_offset)
-
-    transcription = "\n".join(str(sub) for sub in subs) + "\n"
+        transcription = shift_subtitles(transcription, segment_offset)
 
     with open(transcription_path, "w") as subs_file:
         subs_file.write(transcription)
@@ -124,8 +377,30 @@ def transcribe_file(
     return transcription
 
 
+_TIMECODE_RE = re.compile(r"(\d{2}):(\d{2}):(\d{2}),(\d{3}) --> (\d{2}):(\d{2}):(\d{2}),(\d{3})")
+
+
+def _srt_timestamp(total_ms: int) -> str:
+    """Format milliseconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    seconds, milliseconds = divmod(max(total_ms, 0), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
 def shift_subtitles(srt_txt: str, shift: float) -> str:
-    """Shift all subtitles by a given amount of seconds"""
-    subs = pysrt.from_string(srt_txt)
-    subs.shift(seconds=shift)
-    return subs
+    """Shift all subtitles by a given amount of seconds
+
+    Rewrites only the timecode lines in place with a compiled regex; a full
+    pysrt parse would build and re-serialize several objects per cue just to
+    add a constant to two timestamps.
+    """
+    shift_ms = round(shift * 1000)
+
+    def shift_timecode(match: re.Match) -> str:
+        h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(group) for group in match.groups())
+        start = ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1 + shift_ms
+        end = ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2 + shift_ms
+        return f"{_srt_timestamp(start)} --> {_srt_timestamp(end)}"
+
+    return _TIMECODE_RE.sub(shift_timecode, srt_txt)
@@ -1,68 +1,107 @@
+import asyncio
+import gzip
+import json
+import mmap
+import os
 import re
 import textwrap
-from copy import deepcopy
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from itertools import chain
 from pathlib import Path
 from typing import Dict, List
 
-import joblib
 import openai
-import pysrt
 import typer
 from tqdm import tqdm
 
 from subverses.config import Context
+from subverses.errors import Abort
+
+# compiled once; these run per subtitle block, so per-call pattern lookups
+# in re's cache are pure overhead on long files
+# one numbered entry per match; continuation lines (which cannot start
+# with "N:") are folded into the same entry
+_NUM_TEXT_RE = re.compile(r"(\d+):\s*([^\n]*(?:\n(?!\d+:)[^\n]*)*)")
+_TRANSLATED_RE = re.compile(r"'''\n?(.*?)'''", re.DOTALL)
+
+
+# constructing a TextWrapper is not free (it compiles several regexes), so
+# share one instance across the once-per-line word_wrap calls
+_WRAPPER = textwrap.TextWrapper(width=60)
 
 
 def word_wrap(text, line_length=60):
     """Wraps text to a specified line length"""
     # replace all " \\n " with "\n" to avoid word_wrap splitting on those
     text = text.replace(" \\n ", "\n")
-    return "\n".join(textwrap.wrap(text, width=line_length))
+    wrapper = (
+        _WRAPPER if line_length == _WRAPPER.width else textwrap.TextWrapper(width=line_length)
+    )
+    return "\n".join(wrapper.wrap(text))
 
 
-def parse_block(block):
-    """Parse a single subtitle block"""
-    # if block consists of just newline we're at the end of the file
-    if block == "\n" or block == "":
-        return None
-    try:
-        index, timecodes, *text = block.split("\n")
-        # convert list of text lines back to a single string with newlines
-        text = " ".join(text)
+# one pass over the whole buffer capturing index, timecodes and text; the
+# split-per-block / split-per-line approach allocated ~5 intermediate lists
+# per subtitle
+# bytes-mode pattern so finditer can scan an mmap'd file directly; only
+# the captured groups are ever decoded into Python strings
+_SRT_BLOCK_RE = re.compile(
+    rb"(\d+)\r?\n(\d\d:\d\d:\d\d[,.]\d+)\s*-->\s*(\d\d:\d\d:\d\d[,.]\d+)\r?\n(.*?)(?=\r?\n\r?\n|\Z)",
+    re.DOTALL,
+)
+
 
-        # parse start and end times
-        start_time, end_time = timecodes.split(" --> ")
+def _read_srt_bytes(srt_path: Path):
+    """Return the SRT contents as a bytes-like buffer for parsing.
 
-        return {"text": text, "start_time": start_time, "end_time": end_time}
-    except ValueError:
-        typer.echo(f"""Error parsing subtitles. Invalid block "{block}" """, err=True)
+    Plain files are memory-mapped so parsing never materializes the whole
+    file as a Python string; gzipped transcripts have to be decompressed
+    into memory first.
+    """
+    if srt_path.suffix == ".gz":
+        with gzip.open(srt_path, "rb") as srt_file:
+            return srt_file.read()
+    with open(srt_path, "rb") as srt_file:
+        if os.fstat(srt_file.fileno()).st_size == 0:
+            # mmap refuses zero-length files; an empty SRT parses to no cues
+            return b""
+        return mmap.mmap(srt_file.fileno(), 0, access=mmap.ACCESS_READ)
 
 
-def srt_parse(srt_text: str) -> List[Dict[str, str]]:
+def srt_parse(srt_bytes) -> List[Dict[str, str]]:
     """Parse a srt file
 
-    Parse srt file and return a list of dicts containing the timecode
-    and text of each subtitle.
+    Parse srt data (bytes or an mmap) and return a list of dicts
+    containing the timecode and text of each subtitle. Malformed blocks
+    are skipped.
     """
 
-    # split by subtitle blocks
-    blocks = re.split(r"\n\n", srt_text)
-
-    # parse blocks using a list comprehension, filtering out None results
-    subtitles = [sub for block in blocks if (sub := parse_block(block)) is not None]
-
-    return subtitles
+    return [
+        {
+            # multi-line cue text becomes a single line, as before
+            "text": match.group(4).decode("utf-8").replace("\r", "").replace("\n", " "),
+            "start_time": match.group(2).decode("ascii"),
+            "end_time": match.group(3).decode("ascii"),
+        }
+        for match in _SRT_BLOCK_RE.finditer(srt_bytes)
+    ]
 
 
 def srt_dump(*, srt_list, srt_filename):
     """Dump subtitles to a srt file"""
-    with open(srt_filename, "w") as file:
-        for index, subtitle in enumerate(srt_list, start=1):
-            file.write(
+    # build the whole document in memory and hand it over in one write
+    # instead of one buffered write per cue; newline="" keeps the output
+    # byte-identical across platforms
+    with open(srt_filename, "w", encoding="utf-8", newline="") as file:
+        file.write(
+            "".join(
                 f"""{index}\n{subtitle["start_time"]} --> {subtitle["end_time"]}\n{subtitle["text"]}\n\n"""
+                for index, subtitle in enumerate(srt_list, start=1)
             )
-        file.write("\n")
+            + "\n"
+        )
 
 
 def concatenate_srt_list(srt_list):
@@ -70,70 +109,225 @@ def concatenate_srt_list(srt_list):
     return "\n\n".join([f"{i}: {sub['text']}" for i, sub in enumerate(srt_list)])
 
 
-def replace_translation(srt_list: List[Dict[str, str]], new_texts: List[str]):
-    """Replace text in a list of srt dicts"""
+def replace_translation(srt_list: List[Dict[str, str]], translated_text: str):
+    """Replace text in a list of srt dicts with the numbered translations"""
 
-    srt_list = deepcopy(srt_list)
-    for text in new_texts:
-        number, text = re.findall(r"(\d+):\s*(.*)", text)[0]
-        number = int(number)
-        srt_list[number]["text"] = word_wrap(text)
+    # shallow per-dict copies suffice: the values are immutable strings, so
+    # a deepcopy would only re-allocate every string for nothing
+    srt_list = [dict(subtitle) for subtitle in srt_list]
+    # a single pass over the response; the old split-into-blocks plus
+    # search-per-block approach ran two regex operations per entry
+    for match in _NUM_TEXT_RE.finditer(translated_text):
+        srt_list[int(match.group(1))]["text"] = word_wrap(match.group(2).strip())
 
     return srt_list
 
 
-def shift_subtitles(srt_txt: str, shift: float) -> str:
-    """Shift all subtitles by a given amount of seconds"""
-    subs = pysrt.from_string(srt_txt)
-    subs.shift(seconds=shift)
-    return subs
+def _postprocess_chunk(chunk, response):
+    """Extract the translation from a model response and apply it to a chunk"""
+    return replace_translation(chunk, find_translated_text(response))
 
 
 def split_into_chunks(lst, chunk_size, overlap):
-    """Split a list into overlapping chunks"""
+    """Split a list into overlapping chunks, lazily"""
     if chunk_size <= overlap:
         raise ValueError("chunk_size must be greater than overlap")
+    return _iter_chunks(lst, chunk_size, overlap)
+
 
-    chunks = []
+def _iter_chunks(lst, chunk_size, overlap):
+    """Yield overlapping chunk windows one at a time"""
     i = 0  # starting index
 
     while i < len(lst):
-        chunks.append(lst[i : i + chunk_size])
+        yield lst[i : i + chunk_size]
         if i + chunk_size >= len(lst):  # if we're at the last chunk
-            break
+            return
         i += chunk_size - overlap
 
-    return chunks
 
+def _chunk_count(length, chunk_size, overlap):
+    """Number of chunks split_into_chunks will yield for a list of `length`"""
+    if length == 0:
+        return 0
+    if length <= chunk_size:
+        return 1
+    step = chunk_size - overlap
+    return 1 + -(-(length - chunk_size) // step)
 
-def _find_overlap(chunk1, chunk2, overlap):
-    """Find the overlap between two chunks"""
-    if not chunk1:
-        return chunk2
+
+def _splice_overlap(joined, chunk, overlap):
+    """Splice the next chunk onto the accumulator in place"""
+    if not joined:
+        joined.extend(chunk)
+        return
 
     # we're guaranteed that the overlap is >=2
     for i in range(overlap):
-        if chunk1[-overlap + i]["text"] == chunk2[i]["text"]:
-            return chunk1[: -overlap + i] + chunk2[i:]
+        if joined[-overlap + i]["text"] == chunk[i]["text"]:
+            del joined[len(joined) - overlap + i :]
+            joined.extend(chunk[i:])
+            return
 
-    print(f"*** No overlap found:\n{chunk1}\n**** \n{chunk2}")
-    return chunk1 + chunk2[overlap:]
+    print(f"*** No overlap found:\n{joined[-overlap:]}\n**** \n{chunk[:overlap]}")
+    joined.extend(chunk[overlap:])
 
 
 def join_overlapping_chunks(chunks, overlap):
     """Join overlapping chunks"""
 
-    if overlap <= 1:
-        remaining_chunks = [chunk[overlap:] for chunk in chunks[1:]]
-        return list(chain.from_iterable(chunks[0:1] + remaining_chunks))
+    if overlap == 0:
+        # nothing to deduplicate; the output is a plain flattening
+        return list(chain.from_iterable(chunks))
+
+    if overlap == 1:
+        chunk_iter = iter(chunks)
+        first = next(chunk_iter, [])
+        return first + list(chain.from_iterable(chunk[1:] for chunk in chunk_iter))
 
+    # grow one accumulator in place; the old reduce-style joining rebuilt
+    # the whole joined list for every chunk, which is quadratic in the
+    # subtitle count
     joined_chunks = []
     for chunk in chunks:
-        joined_chunks = _find_overlap(joined_chunks, chunk, overlap)
+        _splice_overlap(joined_chunks, chunk, overlap)
 
     return joined_chunks
 
 
+def _dump_wip(state, wip_file: Path):
+    """Write a WIP checkpoint atomically (temporary file + rename)."""
+    tmp_file = wip_file.with_suffix(".tmp")
+    # the state is plain ints, strings and dicts, so gzipped JSON beats
+    # pickling: smaller files, faster dumps, nothing executable on load
+    with gzip.open(tmp_file, "wt", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(tmp_file, wip_file)
+
+
+def _translate_chunks_concurrent(
+    *,
+    srt_chunks,
+    target_language,
+    extra_prompt_instruction,
+    openai_client,
+    model,
+    temperature,
+    concurrency,
+    total,
+    verbose,
+):
+    """Translate chunks independently with bounded concurrency.
+
+    Each chunk gets only the system prompt — forgoing the rolling
+    conversation context removes the serial dependency between requests, so
+    wall time is bounded by the slowest wave instead of the sum of all
+    round trips. Runs are short enough that no WIP checkpointing is done.
+    """
+    progressbar = tqdm(desc="Translating dialog lines", total=total)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def translate_one(chunk):
+        chunk_str = concatenate_srt_list(chunk)
+        messages = translation_message(
+            chunk_str,
+            target_language=target_language,
+            extra_prompt_instruction=extra_prompt_instruction,
+        )
+        async with semaphore:
+            response = await asyncio.to_thread(
+                translate_chunk,
+                openai_client=openai_client,
+                messages=messages,
+                target_language=target_language,
+                model=model,
+                temperature=temperature,
+                verbose=verbose,
+            )
+        progressbar.update()
+        return _postprocess_chunk(chunk, response)
+
+    async def fan_out():
+        return await asyncio.gather(*(translate_one(chunk) for chunk in srt_chunks))
+
+    try:
+        return asyncio.run(fan_out())
+    finally:
+        progressbar.close()
+
+
+def _translate_chunks_batch(
+    *,
+    srt_chunks,
+    target_language,
+    extra_prompt_instruction,
+    openai_client,
+    model,
+    temperature,
+):
+    """Translate all chunks through the OpenAI Batch API.
+
+    One JSONL upload replaces a request per chunk, and batch processing is
+    billed at half price; the job usually finishes well inside the 24h
+    window. Chunks are translated independently, like the concurrent path.
+    """
+    lines = []
+    for i, chunk in enumerate(srt_chunks):
+        messages = translation_messages(
+            translation_message(
+                concatenate_srt_list(chunk),
+                target_language=target_language,
+                extra_prompt_instruction=extra_prompt_instruction,
+            ),
+            target_language=target_language,
+        )
+        lines.append(
+            json.dumps(
+                {
+                    "custom_id": f"chunk-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "messages": messages,
+                        "temperature": temperature,
+                        "max_tokens": 2048,
+                    },
+                }
+            )
+        )
+
+    batch_input = openai_client.files.create(
+        file=("chunks.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = openai_client.batches.create(
+        input_file_id=batch_input.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    typer.echo(f"Waiting for translation batch {batch.id} ({len(srt_chunks)} chunks)...")
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(30)
+        batch = openai_client.batches.retrieve(batch.id)
+    if batch.status != "completed":
+        raise Abort(f"Translation batch {batch.id} ended with status: {batch.status}")
+
+    responses = {}
+    for line in openai_client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        responses[record["custom_id"]] = record["response"]["body"]["choices"][0][
+            "message"
+        ]["content"]
+
+    return [
+        _postprocess_chunk(chunk, responses[f"chunk-{i}"])
+        for i, chunk in enumerate(srt_chunks)
+    ]
+
+
 def translate_srt(
     *,
     srt_path: Path,
@@ -144,13 +338,17 @@ def translate_srt(
     temperature=0.0,
     chunk_size=8,
     overlap=3,
+    concurrency=1,
+    use_batch_api=False,
     verbose=False,
 ):
     """Translate an SRT file
 
     Translation happens in overlapping chunks of `chunk_size` lines,
     with `overlap` lines of overlap. This helps maintain consistent
-    translation.
+    translation. With `concurrency` > 1 the chunks are translated
+    independently in parallel, trading the rolling conversation context
+    for wall time.
     """
     if overlap > chunk_size:
         raise ValueError("Overlap size cannot be larger than chunk size")
@@ -158,70 +356,141 @@ def translate_srt(
         raise ValueError("Overlap size cannot be negative")
 
     # work in progress file
-    wip_file = srt_path.with_suffix(".wip.joblib")
+    wip_file = srt_path.with_suffix(".wip.json.gz")
     wip = None
     if wip_file.exists():
-        wip = joblib.load(wip_file)
+        with gzip.open(wip_file, "rt", encoding="utf-8") as file:
+            wip = json.load(file)
 
-    with open(srt_path, "r", encoding="utf-8") as srt_file:
-        str_list = srt_parse(srt_file.read())
+    str_list = srt_parse(_read_srt_bytes(srt_path))
 
+    # chunks are generated lazily; the batch path needs two passes over
+    # them, so only there is the generator materialized
     srt_chunks = split_into_chunks(str_list, chunk_size, overlap)
+    n_chunks = _chunk_count(len(str_list), chunk_size, overlap)
 
-    progressbar = tqdm(desc="Translating dialog lines", total=len(srt_chunks))
-
-    def chunk_callback():
-        progressbar.update()
-
-    messages = []
-    translated_chunks = []
-    for i, chunk in enumerate(srt_chunks):
-        # rewind to last saved progress
-        if wip and i <= wip["i"]:
-            translated_chunks = wip["translated_chunks"]
-            messages = wip["messages"]
-            chunk_callback()
-            continue
-
-        chunk_str = concatenate_srt_list(chunk)
-        messages += translation_message(
-            chunk_str,
+    if use_batch_api:
+        translated_chunks = _translate_chunks_batch(
+            srt_chunks=list(srt_chunks),
             target_language=target_language,
             extra_prompt_instruction=extra_prompt_instruction,
+            openai_client=openai_client,
+            model=model,
+            temperature=temperature,
         )
+        return join_overlapping_chunks(translated_chunks, overlap)
 
-        response = translate_chunk(
-            openai_client=openai_client,
-            messages=messages[-3:],  # let the model see previous request and response
+    if concurrency > 1:
+        translated_chunks = _translate_chunks_concurrent(
+            srt_chunks=srt_chunks,
             target_language=target_language,
+            extra_prompt_instruction=extra_prompt_instruction,
+            openai_client=openai_client,
             model=model,
             temperature=temperature,
+            concurrency=concurrency,
+            total=n_chunks,
             verbose=verbose,
         )
+        return join_overlapping_chunks(translated_chunks, overlap)
 
-        translated_chunk_str = find_translated_text(response)
-        translated_list = re.split(r"\n\n", translated_chunk_str)
-        translated_chunks += [replace_translation(chunk, translated_list)]
+    progressbar = tqdm(desc="Translating dialog lines", total=n_chunks)
 
-        messages += [
-            {
-                "role": "assistant",
-                "content": response,
-            }
-        ]
+    def chunk_callback():
+        progressbar.update()
+
+    # checkpoints go through a single background worker so serializing the
+    # accumulated state never blocks the next API request
+    checkpointer = ThreadPoolExecutor(max_workers=1)
+    pending_dump = None
+    # response parsing runs on its own worker while the main thread is
+    # blocked on the next API round trip, so the regex work rides for free
+    postprocessor = ThreadPoolExecutor(max_workers=1)
+
+    # only the last exchange is ever sent to the model, so a bounded deque
+    # keeps memory and checkpoint size constant instead of growing with the
+    # whole conversation
+    messages = deque(maxlen=4)
+    responses = []
+    translated_futures = []
+    checked = 0
+    for i, chunk in enumerate(srt_chunks):
+        # rewind to last saved progress
+        resumed = False
+        if wip and i <= wip["i"]:
+            response = wip["responses"][i]
+            try:
+                translated = _postprocess_chunk(chunk, response)
+            except Exception:
+                # a stored response that never applied cleanly would replay
+                # the same failure on every resume; forget the checkpoint
+                # from this chunk on and re-request instead
+                wip = None
+            else:
+                resumed = True
+                if i == wip["i"]:
+                    messages = deque(wip["messages"], maxlen=4)
+                future: Future = Future()
+                future.set_result(translated)
+        if not resumed:
+            chunk_str = concatenate_srt_list(chunk)
+            messages += translation_message(
+                chunk_str,
+                target_language=target_language,
+                extra_prompt_instruction=extra_prompt_instruction,
+            )
+
+            response = translate_chunk(
+                openai_client=openai_client,
+                messages=list(messages)[-3:],  # let the model see previous request and response
+                target_language=target_language,
+                model=model,
+                temperature=temperature,
+                verbose=verbose,
+            )
+
+            messages += [
+                {
+                    "role": "assistant",
+                    "content": response,
+                }
+            ]
+            future = postprocessor.submit(_postprocess_chunk, chunk, response)
+        responses.append(response)
+        translated_futures.append(future)
         chunk_callback()
 
-        # dump progress
-        joblib.dump(
-            {"i": i, "translated_chunks": translated_chunks, "messages": messages}, wip_file
+        # surface failures of already-finished post-processing now rather
+        # than burning an API call on every remaining chunk first
+        while checked < len(translated_futures) and translated_futures[checked].done():
+            translated_futures[checked].result()
+            checked += 1
+
+        if resumed:
+            continue
+
+        # dump progress; a still-queued older dump is superseded
+        if pending_dump is not None:
+            pending_dump.cancel()
+        pending_dump = checkpointer.submit(
+            _dump_wip,
+            {
+                "i": i,
+                "responses": list(responses),
+                "messages": list(messages),
+            },
+            wip_file,
         )
+    translated_chunks = [future.result() for future in translated_futures]
+    checkpointer.shutdown(wait=True)
+    postprocessor.shutdown(wait=True)
     # wip_file.unlink()
     return join_overlapping_chunks(translated_chunks, overlap)
 
 
 def find_translated_text(translated_text):
     """Find the translated text in the response"""
-    match = re.search(r"'''\n?(.*?)'''", translated_text, re.DOTALL)
+    match = _TRANSLATED_RE.search(translated_text)
     if match:
         return match.group(1)
     return translated_text
@@ -291,6 +560,8 @@ def translate(context: Context):
             target_language=context.translate_to,
             model=context.gpt_model,
             openai_client=context.openai_client,
+            concurrency=context.translate_concurrency,
+            use_batch_api=context.use_batch_api,
             verbose=context.verbose,
         )
         srt_dump(srt_list=srt_list, srt_filename=context.translated_srt_path)